@@ -5,7 +5,7 @@ import plotly.graph_objects as go
 import numpy as np
 from plotly.subplots import make_subplots
 from datetime import datetime
-from io import StringIO
+from io import BytesIO, StringIO
 from streamlit_extras.metric_cards import style_metric_cards
 import tempfile
 from fpdf import FPDF
@@ -59,28 +59,265 @@ uploaded_file = st.sidebar.file_uploader(
 )
 
 # ---- LOAD DATA LOGIC ---- #
+PERF_EDGES = np.array([0.0, 100.0, 200.0])  # ROI % lower bounds of the upper three bands
+PERF_LABELS = ["Poor Performer", "Average Performer", "Good Performer", "High Performer"]
+NO_MONTH = np.iinfo(np.int32).min  # month_code for rows without a date
+INTERNAL_COLS = ["month_code"]  # helper keys kept out of the raw table and export
+MAX_POINTS = 5000  # above this, violin/box plots only draw outlier points
+
+def month_labels(codes):
+    # Months since 1970-01 back to "YYYY-MM" strings
+    return (np.datetime64("1970-01") + np.asarray(codes).astype("timedelta64[M]")).astype(str)
+
+@st.cache_data
+def load_file(name, content):
+    # Keyed on the raw bytes, so reruns skip parsing until a different file arrives
+    if name.endswith(".csv"):
+        return pd.read_csv(BytesIO(content), engine="pyarrow")
+    return pd.read_excel(BytesIO(content), engine="openpyxl")
+
 @st.cache_data
 def clean_and_engineer(df):
+    # Sorted by date so the date filter can binary-search a contiguous slice
     df["date"] = pd.to_datetime(df["date"])
-    df["engagement"] = df["likes"] + df["comments"]
-    df["engagement_rate"] = (df["engagement"] / df["reach"].replace(0, np.nan)) * 100
-    df["roas"] = df["revenue"] / df["total_payout"].replace(0, np.nan)
-    df["roi_percentage"] = (df["revenue"] - df["total_payout"]) / df["total_payout"].replace(0, np.nan) * 100
-    df["average_order_value"] = df["revenue"] / df["orders"].replace(0, np.nan)
-    df["performance_category"] = df["roi_percentage"].apply(
-        lambda x: ("High Performer" if x >= 200 else
-                   "Good Performer" if x >= 100 else
-                   "Average Performer" if x >= 0 else
-                   "Poor Performer")
-    )
+    # Compare against naive sidebar dates: drop any timezone, keeping local wall-clock time
+    if df["date"].dt.tz is not None:
+        df["date"] = df["date"].dt.tz_localize(None)
+    df = df.sort_values("date", kind="stable", ignore_index=True)
+    # Integer month key (months since 1970-01) for the monthly groupbys
+    month = df["date"].to_numpy().astype("datetime64[M]")
+    df["month_code"] = np.where(np.isnat(month), NO_MONTH, month.view("i8")).astype(np.int32)
+    # Pull raw arrays once; zero denominators give NaN without temporary Series
+    reach = df["reach"].to_numpy(dtype="float64")
+    payout = df["total_payout"].to_numpy(dtype="float64")
+    orders = df["orders"].to_numpy(dtype="float64")
+    revenue = df["revenue"].to_numpy(dtype="float64")
+    eng = df["likes"].to_numpy() + df["comments"].to_numpy()
+    with np.errstate(divide="ignore", invalid="ignore"):
+        df["engagement"] = eng
+        df["engagement_rate"] = np.where(reach != 0, eng / reach * 100, np.nan)
+        df["roas"] = np.where(payout != 0, revenue / payout, np.nan)
+        df["roi_percentage"] = np.where(payout != 0, (revenue - payout) / payout * 100, np.nan)
+        df["average_order_value"] = np.where(orders != 0, revenue / orders, np.nan)
+    # Band codes index PERF_LABELS; undefined ROI counts as Poor Performer.
+    # from_codes keeps them as the categorical's int8 codes, so no strings are built per row.
+    roi = df["roi_percentage"].to_numpy()
+    perf_codes = np.where(np.isnan(roi), 0, np.searchsorted(PERF_EDGES, roi, side="right")).astype(np.int8)
+    df["performance_category"] = pd.Categorical.from_codes(perf_codes, categories=PERF_LABELS, ordered=True)
+    # Low-cardinality keys as categoricals: groupby/isin compare codes, not strings
+    for c in ("platform", "campaign", "category", "gender", "basis", "name"):
+        df[c] = df[c].astype("category")
     return df
 
+def _code_mask(col, lo, hi, selected):
+    # Membership test on the categorical's integer codes within [lo, hi)
+    codes = col.cat.codes.to_numpy()[lo:hi]
+    sel = col.cat.categories.get_indexer(list(selected))
+    return np.isin(codes, sel[sel >= 0])
+
+# Each entry holds a full filtered frame, so keep only recent filter combinations
+@st.cache_data(max_entries=16)
+def apply_filters(df, date_min, date_max, campaigns, platforms, categories, genders, perf_band):
+    dates = df["date"].to_numpy()
+    lo = np.searchsorted(dates, np.datetime64(date_min), side="left")
+    hi = np.searchsorted(dates, np.datetime64(date_max) + np.timedelta64(1, "D"), side="left")
+    # AND each condition into the first mask in place, instead of stacking
+    # them into a 2-D array for logical_and.reduce
+    mask = _code_mask(df["campaign"], lo, hi, campaigns)
+    mask &= _code_mask(df["platform"], lo, hi, platforms)
+    mask &= _code_mask(df["category"], lo, hi, categories)
+    mask &= _code_mask(df["gender"], lo, hi, genders)
+    if perf_band != "All":
+        perf_codes = df["performance_category"].cat.codes.to_numpy()[lo:hi]
+        mask &= perf_codes == PERF_LABELS.index(perf_band)
+    return df.iloc[lo + np.flatnonzero(mask)]
+
+# ---- CACHED AGGREGATIONS ---- #
+def group_sum3(codes, n_groups, a, b, c):
+    # Sum three value arrays per integer group code in one bincount each;
+    # negative codes (missing keys) are skipped, like groupby's dropna, and
+    # NaN values count as 0, like pandas' sum
+    keep = codes >= 0
+    codes = codes[keep]
+    return tuple(
+        np.bincount(codes, weights=np.where(np.isnan(v[keep]), 0.0, v[keep]), minlength=n_groups)
+        for v in (a, b, c)
+    )
+
+def top_k_positions(vals, k, largest=True):
+    # Row positions of the k largest (or smallest) values, best first, matching
+    # nlargest/nsmallest(keep="first"): ties go by row order, NaN rows come last;
+    # argpartition finds the k-th key in O(N) instead of a full sort
+    vals = np.asarray(vals, dtype="float64")
+    pos = np.flatnonzero(~np.isnan(vals))
+    keys = -vals[pos] if largest else vals[pos]
+    if len(pos) > k:
+        kth = keys[np.argpartition(keys, k - 1)[k - 1]]
+        cand = np.flatnonzero(keys <= kth)  # everything up to and tied with the k-th key
+    else:
+        cand = np.arange(len(pos))
+    top = pos[cand[np.lexsort((cand, keys[cand]))[:k]]]
+    if len(top) < k:
+        # Like nlargest/nsmallest, pad with NaN rows (in row order) up to k
+        top = np.concatenate([top, np.flatnonzero(np.isnan(vals))[:k - len(top)]])
+    return top
+
+@st.cache_data
+def monthly_trend(data):
+    month_code = data["month_code"].to_numpy()
+    has_month = month_code != NO_MONTH
+    months, inv = np.unique(month_code[has_month], return_inverse=True)
+    codes = np.full(len(month_code), -1, dtype=np.intp)
+    codes[has_month] = inv
+    revenue, spend, orders = group_sum3(
+        codes, len(months),
+        data["revenue"].to_numpy(dtype="float64"),
+        data["total_payout"].to_numpy(dtype="float64"),
+        data["orders"].to_numpy(dtype="float64"),
+    )
+    mon = pd.DataFrame({
+        "month": month_labels(months),
+        "revenue": revenue,
+        "spend": spend,
+        "orders": orders.astype("int64"),
+    })
+    mon["roi%"] = (mon["revenue"] - mon["spend"]) / mon["spend"] * 100
+    return mon
+
+@st.cache_data
+def campaign_agg(data):
+    # One pass over the campaign codes feeds both the highlights and the ROI-by-campaign chart
+    codes = data["campaign"].cat.codes.to_numpy()
+    names = data["campaign"].cat.categories
+    roi = data["roi_percentage"].to_numpy(dtype="float64")
+    has_roi = ~np.isnan(roi)
+    rev, pay, roi_sum = group_sum3(
+        codes, len(names),
+        data["revenue"].to_numpy(dtype="float64"),
+        data["total_payout"].to_numpy(dtype="float64"),
+        roi,
+    )
+    keep = codes >= 0
+    rows = np.bincount(codes[keep], minlength=len(names))
+    roi_cnt = np.bincount(codes[keep], weights=has_roi[keep], minlength=len(names))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        camp_agg = pd.DataFrame(
+            {"rev": rev, "pay": pay, "roi_mean": np.where(roi_cnt > 0, roi_sum / roi_cnt, np.nan)},
+            index=pd.Index(names, name="campaign"),
+        )[rows > 0]
+    return camp_agg.assign(**{"roi %": (camp_agg["rev"] - camp_agg["pay"]) / camp_agg["pay"] * 100})
+
+@st.cache_data
+def platform_engagement(data):
+    return data.groupby("platform", observed=True)["engagement_rate"].mean().reset_index()
+
+@st.cache_data
+def cohort_trend(data, group_by, metric):
+    # Undated rows are dropped from the small aggregate, not by copying the frame
+    cohort = data.groupby([group_by, "month_code"], observed=True)[metric].mean().reset_index()
+    cohort = cohort[cohort["month_code"] != NO_MONTH]
+    cohort.insert(1, "year_month", month_labels(cohort.pop("month_code")))
+    return cohort
+
+@st.cache_data
+def roi_outliers(data):
+    # Rows more than 2 std from the mean ROI, in one comparison pass
+    cols = ["name", "campaign", "platform", "roi_percentage", "revenue", "total_payout"]
+    roi = data["roi_percentage"].to_numpy()
+    if np.count_nonzero(~np.isnan(roi)) < 2:
+        # No sample std to compare against (pandas would give NaN and match nothing)
+        return data.iloc[:0][cols]
+    mu, sd = np.nanmean(roi), np.nanstd(roi, ddof=1)
+    with np.errstate(invalid="ignore"):
+        mask = np.abs(roi - mu) > 2 * sd
+    return data.iloc[np.flatnonzero(mask)][cols]
+
+@st.cache_data
+def revenue_hierarchy(data):
+    # Platform → campaign → category revenue, a few hundred rows at most
+    sun = data.groupby(["platform", "campaign", "category"], observed=True)["revenue"].sum().reset_index()
+    return sun.astype({"platform": str, "campaign": str, "category": str})
+
+# ---- CACHED FIGURES ---- #
+# Builders take the small aggregated frames, so the cache key stays cheap
+@st.cache_resource(max_entries=32)
+def build_monthly_fig(mon, height=480):
+    fig = make_subplots(specs=[[{"secondary_y": True}]])
+    fig.add_trace(go.Bar(x=mon["month"], y=mon["revenue"], name="Revenue", marker_color="lightskyblue"), secondary_y=False)
+    fig.add_trace(go.Bar(x=mon["month"], y=mon["spend"], name="Spend", marker_color="salmon"), secondary_y=False)
+    fig.add_trace(go.Scatter(x=mon["month"], y=mon["roi%"], name="ROI %", line=dict(color="green", width=3)), secondary_y=True)
+    fig.update_layout(title_text="Monthly Trend", barmode="group", height=height, legend=dict(orientation="h"))
+    fig.update_yaxes(title_text="USD", secondary_y=False)
+    fig.update_yaxes(title_text="ROI %", secondary_y=True)
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_campaign_roi_fig(camp):
+    return px.bar(
+        camp.sort_values("roi %"),
+        x="roi %",
+        y="campaign",
+        orientation="h",
+        color="roi %",
+        color_continuous_scale="RdYlGn",
+        title="ROI by Campaign",
+        labels={
+            "roi %": "ROI %",
+            "campaign": "Campaign"
+        }
+    )
+
+@st.cache_resource(max_entries=32)
+def build_platform_engagement_fig(eng):
+    fig = px.bar(
+        eng,
+        x="platform", y="engagement_rate", color="engagement_rate",
+        title="Engagement Rate by Platform",
+        labels={
+            "platform": "Platform",
+            "engagement_rate": "Engagement Rate"
+        }
+    )
+    fig.update_layout(coloraxis_colorbar=dict(title="Engagement Rate"))
+    return fig
+
+@st.cache_resource(max_entries=32)
+def build_sunburst_fig(sun):
+    return px.sunburst(
+        sun,
+        path=["platform", "campaign", "category"],
+        values="revenue",
+        color="platform",
+        title="Nested Platform → Campaign → Category Revenue",
+        width=800,    
+        height=600,   
+    )
+
+@st.cache_resource(max_entries=32)
+def build_cohort_fig(cohort_df, group_by, metric):
+    return px.line(cohort_df, x="year_month", y=metric, color=group_by, title=f"{metric.replace('_', ' ').title()} Cohorts Over Time")
+
+@st.cache_data(max_entries=16)
+def to_csv_bytes(data):
+    # pandas streams rows into the binary buffer in chunks, so no full-size str copy
+    buf = BytesIO()
+    data.to_csv(buf, index=False, encoding="utf-8")
+    return buf.getvalue()
+
+# Distribution plots draw individual rows, so they are built fresh, not cached
+def build_roi_violin_fig(data):
+    points = "all" if len(data) <= MAX_POINTS else "outliers"
+    return px.violin(data, y="roi_percentage", color="performance_category", box=True, points=points,
+                     title="ROI (%) Distribution by Performance Category")
+
+def build_engagement_box_fig(data):
+    points = "all" if len(data) <= MAX_POINTS else "outliers"
+    return px.box(data, y="engagement_rate", color="platform", points=points,
+                  title="Engagement Rate Distribution by Platform")
+
 if uploaded_file is not None:
     try:
-        if uploaded_file.name.endswith(".csv"):
-            df = pd.read_csv(uploaded_file)
-        else:
-            df = pd.read_excel(uploaded_file)
+        df = load_file(uploaded_file.name, uploaded_file.getvalue())
         df = clean_and_engineer(df)
         st.success("✅ File uploaded and processed successfully!")
     except Exception as e:
@@ -88,7 +325,8 @@ if uploaded_file is not None:
         st.stop()
 else:
     st.info("No file uploaded yet. Using sample data for demonstration.")
-    df = pd.read_excel("MOCK_DATA-2.xlsx")
+    with open("MOCK_DATA-2.xlsx", "rb") as f:
+        df = load_file("MOCK_DATA-2.xlsx", f.read())
     df = clean_and_engineer(df)
 
 # ---- DYNAMIC FILTERS ---- #
@@ -104,45 +342,39 @@ date_min, date_max = st.sidebar.date_input(
 # Use multiselect for multiple checkbox-like selections
 campaigns = st.sidebar.multiselect(
     "Select Campaign(s):", 
-    options=sorted(df["campaign"].unique()), 
-    default=sorted(df["campaign"].unique())
+    options=df["campaign"].cat.categories.tolist(), 
+    default=df["campaign"].cat.categories.tolist()
 )
 platforms = st.sidebar.multiselect(
     "Select Platform(s):", 
-    options=sorted(df["platform"].unique()), 
-    default=sorted(df["platform"].unique())
+    options=df["platform"].cat.categories.tolist(), 
+    default=df["platform"].cat.categories.tolist()
 )
 categories = st.sidebar.multiselect(
     "Select Category(s):", 
-    options=sorted(df["category"].unique()), 
-    default=sorted(df["category"].unique())
+    options=df["category"].cat.categories.tolist(), 
+    default=df["category"].cat.categories.tolist()
 )
 genders = st.sidebar.multiselect(
     "Select Gender(s):", 
-    options=sorted(df["gender"].unique()), 
-    default=sorted(df["gender"].unique())
+    options=df["gender"].cat.categories.tolist(), 
+    default=df["gender"].cat.categories.tolist()
 )
 
 perf_band = st.sidebar.selectbox(
     "Performance band", 
-    options=["All", "High Performer", "Good Performer", "Average Performer", "Poor Performer"], 
+    options=["All"] + PERF_LABELS[::-1], 
     index=0
 )
 
-# Filter data by user selections
-flt = (
-    df["date"].dt.date.between(date_min, date_max) &
-    df["campaign"].isin(campaigns) &
-    df["platform"].isin(platforms) &
-    df["category"].isin(categories) &
-    df["gender"].isin(genders)
+# Filter data by user selections (tuples keep the cache key hashable)
+data = apply_filters(
+    df, date_min, date_max,
+    tuple(sorted(campaigns)), tuple(sorted(platforms)),
+    tuple(sorted(categories)), tuple(sorted(genders)),
+    perf_band,
 )
 
-if perf_band != "All":
-    flt &= df["performance_category"].eq(perf_band)
-
-data = df[flt]
-
 if data.empty:
     st.warning("No records match the selected filters.")
     st.stop()
@@ -172,13 +404,6 @@ with tabs[0]:
     kpi_cols[2].metric("Overall ROI", f"{roi_all:.1f}%", delta_color="normal" if roi_all >= 0 else "inverse")
     kpi_cols[3].metric("Avg Engagement Rate", f"{data['engagement_rate'].mean():.1f}%")
     kpi_cols[4].metric("Total Orders", f"{data['orders'].sum():,}")
-    style_metric_cards(
-        background_color="#fbfbfb",
-        border_color="#2d6cdf",
-        border_radius_px=10,
-        border_size_px=2,
-        box_shadow=True,
-    )
 
     kpi_cols2 = st.columns(5)
     kpi_cols2[0].metric("Total Reach", f"{data['reach'].sum():,}")
@@ -186,6 +411,7 @@ with tabs[0]:
     kpi_cols2[2].metric("Active Influencers", data["name"].nunique())
     kpi_cols2[3].metric("Avg Order Value", f"${data['average_order_value'].mean():.2f}")
     kpi_cols2[4].metric("Cost / Order", f"${data['total_payout'].sum() / data['orders'].sum():.2f}")
+    # One CSS injection styles both KPI rows
     style_metric_cards(
         background_color="#fbfbfb",
         border_color="#2d6cdf",
@@ -194,67 +420,31 @@ with tabs[0]:
         box_shadow=True,
     )
 
+    camp_agg = campaign_agg(data)
+
     st.subheader("Key Analytical Summary")
     st.info(
         f"""
     - **{data['name'].nunique():,}** active influencers across **{data['platform'].nunique()}** platforms.
-    - **Top performing campaign:** {data.groupby('campaign')['roi_percentage'].mean().idxmax()} 
-      ({data.groupby('campaign')['roi_percentage'].mean().max():.1f}% avg ROI).
-    - **Lowest performing campaign:** {data.groupby('campaign')['roi_percentage'].mean().idxmin()}
-      ({data.groupby('campaign')['roi_percentage'].mean().min():.1f}% avg ROI).
+    - **Top performing campaign:** {camp_agg['roi_mean'].idxmax()} 
+      ({camp_agg['roi_mean'].max():.1f}% avg ROI).
+    - **Lowest performing campaign:** {camp_agg['roi_mean'].idxmin()}
+      ({camp_agg['roi_mean'].min():.1f}% avg ROI).
     - **Most active day:** {data['date'].value_counts().idxmax().date()}.
     """
     )
 
     # Monthly trend chart
-    trend = data.copy()
-    trend["month"] = trend["date"].dt.to_period("M").astype(str)
-    mon = trend.groupby("month").agg(
-        revenue=("revenue", "sum"),
-        spend=("total_payout", "sum"),
-        orders=("orders", "sum")
-    ).reset_index()
-    mon["roi%"] = (mon["revenue"] - mon["spend"]) / mon["spend"] * 100
-
-    fig = make_subplots(specs=[[{"secondary_y": True}]])
-    fig.add_trace(go.Bar(x=mon["month"], y=mon["revenue"], name="Revenue", marker_color="lightskyblue"), secondary_y=False)
-    fig.add_trace(go.Bar(x=mon["month"], y=mon["spend"], name="Spend", marker_color="salmon"), secondary_y=False)
-    fig.add_trace(go.Scatter(x=mon["month"], y=mon["roi%"], name="ROI %", line=dict(color="green", width=3)), secondary_y=True)
-    fig.update_layout(title_text="Monthly Trend", barmode="group", height=480, legend=dict(orientation="h"))
-    fig.update_yaxes(title_text="USD", secondary_y=False)
-    fig.update_yaxes(title_text="ROI %", secondary_y=True)
-    st.plotly_chart(fig, use_container_width=True)
+    mon = monthly_trend(data)
+    st.plotly_chart(build_monthly_fig(mon), use_container_width=True)
     
     c1, c2 = st.columns(2)
     with c1:
-        camp = data.groupby("campaign").agg({"revenue": "sum", "total_payout": "sum"}).reset_index()
-        camp["roi %"] = (camp["revenue"] - camp["total_payout"]) / camp["total_payout"] * 100
-        fig = px.bar(
-            camp.sort_values("roi %"),
-            x="roi %",
-            y="campaign",
-            orientation="h",
-            color="roi %",
-            color_continuous_scale="RdYlGn",
-            title="ROI by Campaign",
-            labels={
-                "roi %": "ROI %",
-                "campaign": "Campaign"
-            }
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        camp = camp_agg.reset_index()
+        st.plotly_chart(build_campaign_roi_fig(camp), use_container_width=True)
     with c2:
-        eng = data.groupby("platform")["engagement_rate"].mean().reset_index()
-        fig = px.bar(
-        eng,
-        x="platform", y="engagement_rate", color="engagement_rate",
-        title="Engagement Rate by Platform",
-        labels={
-            "platform": "Platform",
-            "engagement_rate": "Engagement Rate"
-        }
-    )
-    fig.update_layout(coloraxis_colorbar=dict(title="Engagement Rate"))
+        eng = platform_engagement(data)
+        fig = build_platform_engagement_fig(eng)
     st.plotly_chart(fig, use_container_width=True)
 
 
@@ -311,7 +501,7 @@ with tabs[2]:
     with col1:
         st.subheader("Top 10 Influencers")
         st.dataframe(
-            data.nlargest(10, metric_col)[
+            data.iloc[top_k_positions(data[metric_col].to_numpy(), 10)][
                 ["name", "platform", "campaign", "engagement_rate", "orders", "roi_percentage", "revenue", "followers"]
                 if "followers" in data.columns
                 else ["name", "platform", "campaign", "engagement_rate", "orders", "roi_percentage", "revenue"]
@@ -330,7 +520,7 @@ with tabs[2]:
     with col2:
         st.subheader("Bottom 10 Influencers")
         st.dataframe(
-            data.nsmallest(10, metric_col)[
+            data.iloc[top_k_positions(data[metric_col].to_numpy(), 10, largest=False)][
                 ["name", "platform", "campaign", "engagement_rate", "orders", "roi_percentage", "revenue", "followers"]
                 if "followers" in data.columns
                 else ["name", "platform", "campaign", "engagement_rate", "orders", "roi_percentage", "revenue"]
@@ -377,6 +567,7 @@ with tabs[2]:
                                 else px.colors.qualitative.Set1 if color_by == "platform"
                                 else px.colors.diverging.Portland,  # for categories
         size_max=22,
+        render_mode="webgl",
     )
     fig.update_layout(
         height=450, 
@@ -393,20 +584,12 @@ with tabs[3]:
     st.header("📝 Content & Audience Analysis")
 
     # Only the content category distribution (single column chart)
-    perf_cat = data.groupby(["category", "performance_category"]).size().unstack(fill_value=0)
+    perf_cat = data.groupby(["category", "performance_category"], observed=True).size().unstack(fill_value=0)
     st.bar_chart(perf_cat)
     st.caption("Distribution of performance bands across content categories.")
     
     st.subheader("Campaigns by Platform")
-    sunburst_fig = px.sunburst(
-        data,
-        path=["platform", "campaign", "category"],
-        values="revenue",
-        color="platform",
-        title="Nested Platform → Campaign → Category Revenue",
-        width=800,    
-        height=600,   
-    )
+    sunburst_fig = build_sunburst_fig(revenue_hierarchy(data))
     st.plotly_chart(sunburst_fig, use_container_width=False)  
 
 # ───────── TAB 5: COMPARISONS ───────── #
@@ -416,7 +599,7 @@ with tabs[4]:
     compare_by = st.selectbox("Compare by:", ["platform", "gender", "category", "campaign"])
     metric = st.selectbox("Metric:", ["revenue", "orders", "roi_percentage", "engagement_rate", "total_payout"])
     if compare_by and metric:
-        metric_df = data.groupby(compare_by)[metric].mean().reset_index()
+        metric_df = data.groupby(compare_by, observed=True)[metric].mean().reset_index()
         bar = px.bar(metric_df, x=compare_by, y=metric, color=compare_by, title=f"Avg {metric.replace('_', ' ').title()} by {compare_by.title()}")
         st.plotly_chart(bar, use_container_width=True)
         pie = px.pie(metric_df, names=compare_by, values=metric, title=f"{metric.replace('_', ' ').title()} Share by {compare_by.title()}")
@@ -426,12 +609,11 @@ with tabs[4]:
 with tabs[5]:
     st.header("📆 Seasonality & Cohort Trends")
 
-    data["year_month"] = data["date"].dt.to_period("M").astype(str)
     group_by = st.radio("Cohort by:", ["platform", "campaign", "category"], horizontal=True)
     metric_sel = st.selectbox("Trend metric:", ["revenue", "orders", "roi_percentage", "engagement_rate"])
 
-    cohort_df = data.groupby([group_by, "year_month"])[metric_sel].mean().reset_index()
-    fig = px.line(cohort_df, x="year_month", y=metric_sel, color=group_by, title=f"{metric_sel.replace('_', ' ').title()} Cohorts Over Time")
+    cohort_df = cohort_trend(data, group_by, metric_sel)
+    fig = build_cohort_fig(cohort_df, group_by, metric_sel)
     st.plotly_chart(fig, use_container_width=True)
 
 # ───────── TAB 7: DISTRIBUTIONS & OUTLIERS ───────── #
@@ -441,22 +623,15 @@ with tabs[6]:
     c1, c2 = st.columns(2)
     with c1:
         # Violin plot for ROI Distribution (shows density, spread, and quartiles)
-        fig = px.violin(data, y="roi_percentage", color="performance_category", box=True, points="all",
-                        title="ROI (%) Distribution by Performance Category")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_roi_violin_fig(data), use_container_width=True)
 
     with c2:
         # Box plot + swarm/strip-like plot overlay for Engagement Rate
         # Plotly doesn't have swarm plot natively, so we do a box plot with points
-        fig = px.box(data, y="engagement_rate", color="platform", points="all",
-                     title="Engagement Rate Distribution by Platform")
-        st.plotly_chart(fig, use_container_width=True)
+        st.plotly_chart(build_engagement_box_fig(data), use_container_width=True)
 
     st.subheader("Top/Bottom ROI Outliers")
-    outlier_df = data.loc[
-        (data["roi_percentage"] > data["roi_percentage"].mean() + 2 * data["roi_percentage"].std()) |
-        (data["roi_percentage"] < data["roi_percentage"].mean() - 2 * data["roi_percentage"].std())
-    ][["name", "campaign", "platform", "roi_percentage", "revenue", "total_payout"]]
+    outlier_df = roi_outliers(data)
     st.dataframe(outlier_df, use_container_width=True)
 
 # ───────── TAB 8: RAW DATA & EXPORT ───────── #
@@ -464,8 +639,9 @@ with tabs[7]:
     st.header("Raw Filtered Data & Report Export")
     st.write("Preview & download your filtered influencer campaign data.")
 
-    st.dataframe(data, use_container_width=True)
-    csv = data.to_csv(index=False).encode("utf-8")
+    raw = data.drop(columns=INTERNAL_COLS)
+    st.dataframe(raw, use_container_width=True)
+    csv = to_csv_bytes(raw)
     st.download_button("Download CSV", csv, "filtered_influencer_data.csv", "text/csv", key="download-csv")
 
     st.markdown("---")
@@ -499,53 +675,17 @@ with tabs[7]:
         )
         pdf.ln(2)
 
-        # Add key charts (reuse your actual chart code)
-        charts = []
-
-        # 1. Monthly Trend Chart
-        trend = data.copy()
-        trend["month"] = trend["date"].dt.to_period("M").astype(str)
-        mon = trend.groupby("month").agg(
-            revenue=("revenue", "sum"),
-            spend=("total_payout", "sum"),
-            orders=("orders", "sum")
-        ).reset_index()
-        mon["roi%"] = (mon["revenue"] - mon["spend"]) / mon["spend"] * 100
-        fig = make_subplots(specs=[[{"secondary_y": True}]])
-        fig.add_trace(go.Bar(x=mon["month"], y=mon["revenue"], name="Revenue", marker_color="lightskyblue"), secondary_y=False)
-        fig.add_trace(go.Bar(x=mon["month"], y=mon["spend"], name="Spend", marker_color="salmon"), secondary_y=False)
-        fig.add_trace(go.Scatter(x=mon["month"], y=mon["roi%"], name="ROI %", line=dict(color="green", width=3)), secondary_y=True)
-        fig.update_layout(title_text="Monthly Trend", barmode="group", height=400, legend=dict(orientation="h"))
-        charts.append(("Monthly Trend", fig))
-
-        # 2. ROI By Campaign Chart
-        camp = data.groupby("campaign").agg({"revenue": "sum", "total_payout": "sum"}).reset_index()
-        camp["roi %"] = (camp["revenue"] - camp["total_payout"]) / camp["total_payout"] * 100
-        fig2 = px.bar(
-            camp.sort_values("roi %"),
-            x="roi %",
-            y="campaign",
-            orientation="h",
-            color="roi %",
-            color_continuous_scale="RdYlGn",
-            title="ROI by Campaign"
-        )
-        charts.append(("ROI by Campaign", fig2))
-
-        # 3. Engagement Rate by Platform
-        eng = data.groupby("platform")["engagement_rate"].mean().reset_index()
-        fig3 = px.bar(eng, x="platform", y="engagement_rate", color="engagement_rate", title="Engagement Rate by Platform")
-        charts.append(("Engagement by Platform", fig3))
-
-        # 4. ROI Distribution (Violin)
-        fig4 = px.violin(data, y="roi_percentage", color="performance_category", box=True, points="all", title="ROI (%) Distribution")
-        charts.append(("ROI Distribution", fig4))
-
-        # 5. Engagement Rate Distribution (Box)
-        fig5 = px.box(data, y="engagement_rate", color="platform", points="all", title="Engagement Rate by Platform")
-        charts.append(("Engagement Distribution", fig5))
-
-        # Add charts to PDF
+        # Same aggregates and figure builders as the tabs, so nothing is recomputed
+        charts = [
+            ("Monthly Trend", build_monthly_fig(monthly_trend(data), height=400)),
+            ("ROI by Campaign", build_campaign_roi_fig(campaign_agg(data).reset_index())),
+            ("Engagement by Platform", build_platform_engagement_fig(platform_engagement(data))),
+            ("ROI Distribution", build_roi_violin_fig(data)),
+            ("Engagement Distribution", build_engagement_box_fig(data)),
+        ]
+
+        # Add charts to PDF. Exports stay serial: kaleido 0.2 runs them one at a time
+        # anyway, and kaleido 1.x would start a browser per concurrent export.
         for title, fig in charts:
             chart_img = plotly_fig_to_img(fig)
             pdf.add_page()
@@ -558,12 +698,24 @@ with tabs[7]:
         pdf.add_page()
         pdf.set_font("Arial", "B", 14)
         pdf.cell(0, 12, "Top/Bottom ROI Outliers", ln=True)
-        outlier_df = data.loc[
-            (data["roi_percentage"] > data["roi_percentage"].mean() + 2 * data["roi_percentage"].std()) |
-            (data["roi_percentage"] < data["roi_percentage"].mean() - 2 * data["roi_percentage"].std())
-        ][["name", "campaign", "platform", "roi_percentage", "revenue", "total_payout"]]
+        outlier_df = roi_outliers(data)
+        # One fixed-width cell per field rather than laying out a to_string() dump
+        widths = [45, 40, 25, 25, 27, 28]
+        fmts = {
+            "roi_percentage": "{:.1f}%".format,
+            "revenue": "${:,.0f}".format,
+            "total_payout": "${:,.0f}".format,
+        }
+        pdf.set_font("Arial", "B", 8)
+        for col, w in zip(outlier_df.columns, widths):
+            pdf.cell(w, 6, col, border=1)
+        pdf.ln(6)
         pdf.set_font("Arial", size=8)
-        pdf.multi_cell(0, 6, outlier_df.to_string(index=False))
+        col_fmts = [fmts.get(col, str) for col in outlier_df.columns]
+        for row in outlier_df.itertuples(index=False):
+            for val, w, fmt in zip(row, widths, col_fmts):
+                pdf.cell(w, 6, fmt(val), border=1)
+            pdf.ln(6)
 
         return pdf.output(dest="S").encode("latin-1")
 